@@ -9,8 +9,8 @@ import pandas as pd
 import sys
 import logging
 from dataclasses import dataclass
-import json
-from graph.graph_data import GraphData, path_contains_graph
+import orjson
+from graph.graph_data import GraphData, hash_attrs, path_contains_graph
 from graph.graph_logic import ConversionArgs
 
 
@@ -41,24 +41,30 @@ class Args:
         
         if not path_contains_graph(self.graph_output_folder) or force_regen:
             log.info("Generating callgraphs")
-            ret = subprocess.call(args)
+            # stderr is merged into stdout, so we can stream both to the log without risking a deadlock.
+            # (undecodable output is replaced rather than failing the run midway)
+            with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  encoding="utf-8", errors="replace", bufsize=1) as proc:
+                for line in proc.stdout:
+                    log.info(f"genCallgraph: {line.rstrip()}")
+            ret = proc.returncode
             if ret != 0:
                 log.error(f"Generating callgraphs failed")
                 raise ValueError("Generating callgraph failed, see log for details")
             
             # on success, generate metadata for caching purposes
-            with open(self.graph_output_folder / "meta.json", 'w', encoding='utf-8') as meta:
+            with open(self.graph_output_folder / "meta.json", 'wb') as meta:
                 attrs = {**self.__dict__ }
                 for k, v in attrs.items():
                     if isinstance(v, Path):
                         attrs[k] = str(v)
-                hash_val = hash(json.dumps(attrs))
-                json.dump({
+                hash_val = hash_attrs(attrs)
+                meta.write(orjson.dumps({
                     "type": "callgraph",
                     "hierch": HierarchyType.method.name,
                     "attrs": attrs,
                     "hash": hash_val
-                }, meta)
+                }))
         else:
             log.info(f"Using pre-existing graph files at {self.graph_output_folder}")
         
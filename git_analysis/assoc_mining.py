@@ -2,14 +2,14 @@ from typing import Any, Dict, Mapping, NamedTuple, Optional, Iterable, List, Set
 
 from .git_processor import GitProcessor
 from .java_type import JavaIdentifier
-from .java_change import HierarchyType, JavaChange
-from mlxtend.frequent_patterns import apriori, fpgrowth, fpmax, association_rules
+from .java_change import HierarchyType
+from mlxtend.frequent_patterns import fpgrowth, association_rules
 import logging
 from tqdm import tqdm
 import pandas as pd
 import numpy as np
-from graph.graph_data import GraphData
-import json
+import scipy.sparse
+from graph.graph_data import GraphData, hash_attrs
 
 log = logging.getLogger("assoc_mining")
 
@@ -27,41 +27,47 @@ def convert_to_item_basket_onehot(commits_or_prs: Iterable[Mapping[str, Any]],
         the same)
     """
 
-    records: List[Any] = []
-    def change_to_desired_identifier(change: JavaChange) -> Optional[JavaIdentifier]:
-        if hierarchy_type == HierarchyType.method:
-            return change.identifier.as_method()
-        if hierarchy_type == HierarchyType.type_def:
-            return change.identifier.as_class()
-        if hierarchy_type == HierarchyType.package:
-            return change.identifier.as_package()
+    # (basket, item) pairs, as parallel lists
+    basket_ids: List[Any] = []
+    items: List[str] = []
+    str_to_iden: Dict[str, JavaIdentifier] = {}
+    # projects a changed identifier to the desired hierarchy, or None if it has no such level
+    if hierarchy_type == HierarchyType.method:
+        to_desired_identifier = JavaIdentifier.as_method
+    elif hierarchy_type == HierarchyType.type_def:
+        to_desired_identifier = JavaIdentifier.as_class
+    elif hierarchy_type == HierarchyType.package:
+        to_desired_identifier = JavaIdentifier.as_package
+    else:
         raise ValueError("Impossible")
 
     index_col = "number" if commit_or_pr == "pr" else "id"
     for obj in commits_or_prs:
         changes = set(
-            change_to_desired_identifier(change) for patch in obj["parsed_patches"]
+            to_desired_identifier(change.identifier) for patch in obj["parsed_patches"]
             for change in patch.changes
-            if change_to_desired_identifier(change) is not None
         )
+        changes.discard(None)
         if len(changes) == 0:
             # skip if no .java files were changed
             continue
-        records.extend(({
-            "basket_id": obj[index_col],
-            "item": change
-        } for change in changes))
-
-    str_to_iden = {
-        str(rec["item"]): rec["item"] 
-        for rec in records
-    }
-
-    df = pd.DataFrame.from_records(records)
-    df.set_index("basket_id", inplace=True)
-    sparse_type = pd.SparseDtype(np.bool8, False)
-    onehot = pd.get_dummies(df, prefix="", prefix_sep="")\
-               .groupby(level=0).max()#.astype(sparse_type)
+        basket_id = obj[index_col]
+        for change in changes:
+            item = str(change)
+            str_to_iden[item] = change
+            basket_ids.append(basket_id)
+            items.append(item)
+
+    # The one-hot matrix is built directly in sparse form from the (basket, item) pairs, the same pair
+    # may appear more than once(e.g, a merge commit appears once for each parent), but is only counted once.
+    basket_codes, basket_index = pd.factorize(basket_ids, sort=True)
+    item_codes, item_index = pd.factorize(items, sort=True)
+    matrix = scipy.sparse.csr_matrix((np.ones(len(items), dtype=np.bool_), (basket_codes, item_codes)),
+                                     shape=(len(basket_index), len(item_index)))
+    matrix.sum_duplicates()
+    matrix.data[:] = True
+    onehot = pd.DataFrame.sparse.from_spmatrix(matrix, index=pd.Index(basket_index, name="basket_id"),
+                                               columns=pd.Index(item_index))
     
     log.info(f"item type: {hierarchy_type.name}, basket type: {commit_or_pr}, #baskets: {len(onehot)}, #items: {len(onehot.columns)}")
 
@@ -120,8 +126,8 @@ class AssocAnalyzer:
         df = self._freq_itemsets.get((commit_or_pr, hierch_type, min_support), None)
         if df is None:
             one_hot, _ = self._get_onehot(commit_or_pr, hierch_type)
-            df = apriori(one_hot, min_support=min_support,
-                                    max_len=2, use_colnames=True, verbose=1)
+            df = fpgrowth(one_hot, min_support=min_support,
+                          max_len=2, use_colnames=True, verbose=1)
             self._freq_itemsets[(commit_or_pr, hierch_type, min_support)] = df
         return df
 
@@ -191,7 +197,7 @@ class AssocAnalyzer:
             "git_url": self._git_url,
             **model.params._asdict()
         } 
-        hash_val = hash(json.dumps(attrs))
+        hash_val = hash_attrs(attrs)
         return GraphData(
             vertices=vertices,
             edges=edges,
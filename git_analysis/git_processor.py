@@ -5,19 +5,20 @@ Entry point to the
 from genericpath import exists
 from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Any, Union
 import pygit2
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 from git_analysis.java_change import JavaChange
 from .java_change_detector import JavaChangeDetector
 from tqdm import tqdm
 import logging
 from pathlib import Path
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, nullcontext
 import re
 import sys
 import shelve
 import requests
 import json
-from tqdm import tqdm
 
 log = logging.getLogger("git_processor")
 
@@ -106,10 +107,11 @@ class GitProcessor(AbstractContextManager):
             self._process_all_prs()
         return self.shelve["processed"]
 
-    def get_processed_commits(self, refresh=False) -> Tuple[List[Any], Mapping[str, Any]]:
+    def get_processed_commits(self, refresh=False, workers: Optional[int] = 1) -> Tuple[List[Any], Mapping[str, Any]]:
         """ On first run(or if refresh=True), traverses all commits in the git repository
             and then processes the .java files changed within each commit(between a commit and its parent)
-            using the Java change detector.
+            using the Java change detector. By default commits are processed sequentially in the current process,
+            'workers' > 1 processes them in a pool of that many processes(None for the number of CPUs)
 
             Returns a tuple containing:
             
@@ -121,7 +123,7 @@ class GitProcessor(AbstractContextManager):
                (both data structures contain)
         """
         if "processed_commits" not in self.shelve or refresh:
-            self._process_all_commits()
+            self._process_all_commits(workers)
         return self.shelve["processed_commits"], self.shelve["processed_commits_by_id"]
 
     def _get_github_prs(self, refresh=False) -> Dict[str, Any]:
@@ -155,23 +157,36 @@ class GitProcessor(AbstractContextManager):
 
         return pulls
 
-    def _process_all_commits(self):
-        count_walk = self.repo.walk(self.repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL) 
-        log.debug("Counting number of commits in repo")
-        count = sum(1 for _c in count_walk)
-        log.debug(f"A total of {count} commits were detected")
+    def _process_all_commits(self, workers: Optional[int] = 1):
+        walk = self.repo.walk(self.repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL) 
+        commit_hashes = [str(commit.id) for commit in walk]
+        log.debug(f"A total of {len(commit_hashes)} commits were detected")
 
         commits = []
         commits_by_id = {}
 
-        walk = self.repo.walk(self.repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL) 
-        for commit in tqdm(walk, total=count, desc="Processing commits"):
-            for commit_object in self.process_commit(commit):
-                commit_id = commit_object["id"]
-                commits.append(commit_object)
-                if commit_id not in commits_by_id:
-                    commits_by_id[commit_id] = []
-                commits_by_id[commit_id].append(commit_object)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_commit_worker,
+                                           initargs=(self.url, str(self.git_path), str(self.shelve_path)))
+            # consecutive commits tend to share file versions, so we give each worker contiguous
+            # runs of commits to make better use of its parse cache
+            chunksize = max(1, len(commit_hashes) // (workers * 4))
+            results = executor.map(_process_commit_in_worker, commit_hashes, chunksize=chunksize)
+        else:
+            executor = nullcontext()
+            results = (list(self.process_commit(commit_hash)) for commit_hash in commit_hashes)
+
+        with executor:
+            for commit_objects in tqdm(results, total=len(commit_hashes), desc="Processing commits"):
+                for commit_object in commit_objects:
+                    commit_id = commit_object["id"]
+                    commits.append(commit_object)
+                    if commit_id not in commits_by_id:
+                        commits_by_id[commit_id] = []
+                    commits_by_id[commit_id].append(commit_object)
 
         log.info(f"Processed a total of {len(commits)} parent-child commit pairs, "
                  f"or {len(commits_by_id)} commits")
@@ -274,6 +289,18 @@ class GitProcessor(AbstractContextManager):
             yield commit_object
 
 
+# used by worker processes when processing commits in parallel, each worker has its own repository
+# and change detector
+_worker_processor: Optional[GitProcessor] = None
+
+def _init_commit_worker(url: str, git_path: str, shelve_path: str):
+    global _worker_processor
+    _worker_processor = GitProcessor(url, git_path, shelve_path)
+
+def _process_commit_in_worker(commit_hash: str) -> List[Mapping[str, Any]]:
+    return list(_worker_processor.process_commit(commit_hash))
+
+
 # misc utilities
 
 def git_repo_to_folder(repo_url: str) -> str:
@@ -285,9 +312,3 @@ def git_repo_to_owner_and_repo(repo_url: str) -> Tuple[str, str]:
         repo_url
     ))
     return match.group(1), match.group(2)
-
-def test_repo_url():
-    assert git_repo_to_folder("git@github.com:skylot/jadx.git") == "jadx"
-    assert git_repo_to_owner_and_repo("git@github.com:skylot/jadx.git") == ("skylot", "jadx")
-    assert git_repo_to_folder("https://github.com/skylot/jadx.git") == "jadx"
-    assert git_repo_to_owner_and_repo("git@github.com:skylot/jadx.git") == ("skylot", "jadx")
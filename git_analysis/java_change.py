@@ -4,49 +4,53 @@
 """
 from typing import NamedTuple, Optional, Tuple, List, Iterable
 from enum import IntEnum
+from bisect import bisect_left, bisect_right
 from .java_type import JavaHierarchy, JavaIdentifier, HierarchyType, JavaFile, JavaClass, JavaMethod
 
 class PosToJavaUnitMatcher:
     """ Responsible for matching byte positions in the original file, to
-        the Java hierarchy that they belong to. Positions are assumed to be given in an ascending order"""
+        the Java hierarchy that they belong to. Lookups are binary searches over the
+        flattened tree, so positions and ranges may be queried in any order. """
 
-    __slots__ = ['_it', '_cur', '_next']
+    __slots__ = ['_nodes', '_starts', '_ends', '_parents']
     def __init__(self, root: JavaHierarchy):
-        self._it = root.iterate_dfs_preorder()
-        self._cur = next(self._it)
-        self._next = next(self._it, None)
+        # The tree is flattened in DFS preorder(which is also ordered by start position), with each
+        # node's parent given by its index in the flattened tree(-1 for the root)
+        self._nodes = list(root.iterate_dfs_preorder())
+        self._starts = [node.start for node in self._nodes]
+        self._ends = [node.end for node in self._nodes]
+        node_to_index = {id(node): i for i, node in enumerate(self._nodes)}
+        self._parents = [-1 if node is root else node_to_index[id(node.parent)] for node in self._nodes]
+
+    def _last_started_index(self, pos: int) -> int:
+        """ Index of the last node whose declaration starts at or before the given position
+            (positions before the root are treated as belonging to it) """
+        return max(bisect_right(self._starts, pos) - 1, 0)
 
     def find(self, pos: int) -> JavaHierarchy:
         """ Finds the most specific Java hierarchy to which the byte at given
             position belongs to. 
         """
-        assert pos >= self._cur.start, "Byte positions must be given in weakly increasing order"
-
-        while self._next is not None and pos >= self._next.start:
-            self._cur = self._next
-            self._next = next(self._it, None)
+        i = self._last_started_index(pos)
 
         # If the position is beyond the current declaration, but before the next one(
         # or the next one doesn't exist) - e.g, a change between two adjacent methods,
         # or after the last method, then we must belong to the parent (e.g, the class
         # containing them)
-        candidate = self._cur
-        while pos >= candidate.end and candidate.parent is not None:
-            candidate  = candidate.parent
-        return candidate
+        ends, parents = self._ends, self._parents
+        while pos >= ends[i] and parents[i] >= 0:
+            i = parents[i]
+        return self._nodes[i]
 
     def find_range(self, from_pos: int, to_pos: int) -> Iterable[JavaHierarchy]:
         """ Finds the most specific Java hierarchies to which bytes changed
-            at the given range belong to. Like `find`, this assumes byte ranges
-            are given in monotonically ascending order.
+            at the given range belong to.
         """
-        cur_hierch = self.find(from_pos)
-        yield cur_hierch
+        yield self.find(from_pos)
 
-        while self._next is not None and self._next.start < to_pos:
-            yield self._next
-            self._cur = self._next
-            self._next = next(self._it, None)
+        nodes, starts = self._nodes, self._starts
+        for i in range(self._last_started_index(from_pos) + 1, bisect_left(starts, to_pos)):
+            yield nodes[i]
 
 
 class ChangeType(IntEnum):
@@ -7,6 +7,7 @@ to the nearest Java elements that contain them, based on their byte offsets in t
 """
 from __future__ import annotations
 from typing import Any, Optional, List, Iterable, Tuple, NamedTuple, Set
+from collections import OrderedDict
 import pygit2
 import logging
 from .java_decl_parser import JavaParser, JavaHierarchy
@@ -72,29 +73,47 @@ class GitHunkOffsets(NamedTuple):
 class JavaChangeDetector:
     """ Used to determine changes to a Java project via git """
 
+    # Max number of parsed blobs to keep around. Most files aren't changed by a given commit, so the
+    # 'new' version of a file in one commit is usually the 'old' version in a later commit.
+    PARSE_CACHE_SIZE = 4096
+
     def __init__(self, repo: pygit2.Repository):
         self.__repo = repo
         self.__parser = JavaParser()
+        # blob oid -> parsed hierarchy, in LRU order
+        self.__parse_cache: OrderedDict[pygit2.Oid, JavaHierarchy] = OrderedDict()
+
+    def __parse_blob(self, blob_id: pygit2.Oid) -> JavaHierarchy:
+        """ Parses the Java file stored in the given blob. Since a blob's oid is a hash of its contents,
+            hierarchies are cached by it. """
+        hierarchy = self.__parse_cache.get(blob_id)
+        if hierarchy is not None:
+            self.__parse_cache.move_to_end(blob_id)
+            return hierarchy
+        contents: bytes = self.__repo[blob_id].data
+        hierarchy = self.__parser.parse_java_bytes(contents)
+        self.__parse_cache[blob_id] = hierarchy
+        if len(self.__parse_cache) > self.PARSE_CACHE_SIZE:
+            self.__parse_cache.popitem(last=False)
+        return hierarchy
 
     def identify_changes_new_file(self, patch) -> Iterable[JavaChange]:
 
         new_file = patch.delta.new_file
-        new_file_contents: bytes = self.__repo[new_file.id].data
 
         log.debug(f"Identifying changes in a new file {new_file.path}")
 
-        hierarchy = self.__parser.parse_java_bytes(new_file_contents)
+        hierarchy = self.__parse_blob(new_file.id)
         for hierch in hierarchy.iterate_dfs_preorder():
             yield JavaChange(identifier=JavaIdentifier.from_bottommost_hierarchy(hierch),
                              change_type=ChangeType.ADD)
 
     def identify_changes_deleted_file(self, patch) -> Iterable[JavaChange]:
         deleted_file = patch.delta.old_file
-        deleted_file_contents: bytes = self.__repo[deleted_file.id].data
         
         log.debug(f"Identifying changes in a deleted file {deleted_file.path}")
 
-        hierarchy = self.__parser.parse_java_bytes(deleted_file_contents)
+        hierarchy = self.__parse_blob(deleted_file.id)
         for hierch in hierarchy.iterate_dfs_preorder():
             yield JavaChange(identifier=JavaIdentifier.from_bottommost_hierarchy(hierch),
                              change_type=ChangeType.DELETE)
@@ -102,19 +121,16 @@ class JavaChangeDetector:
     def identify_changes_modified_file(self, patch) -> Iterable[JavaChange]:
         old_file = patch.delta.old_file
         new_file = patch.delta.new_file
-        old_content: bytes = self.__repo[old_file.id].data
-        new_content: bytes = self.__repo[new_file.id].data
 
         log.debug(f"Identifying changes in a modified file {old_file.path}")
-        old_hierch = self.__parser.parse_java_bytes(old_content)
-        new_hierch = self.__parser.parse_java_bytes(new_content)
+        old_hierch = self.__parse_blob(old_file.id)
+        new_hierch = self.__parse_blob(new_file.id)
         old_hierch_matcher = PosToJavaUnitMatcher(old_hierch)
         new_hierch_matcher = PosToJavaUnitMatcher(new_hierch)
         deletes: Set[JavaIdentifier] = set()
         adds: Set[JavaIdentifier] = set()
         for hunk in patch.hunks:
             hunk_offsets = GitHunkOffsets.from_pygit_hunk(hunk)
-            # print("Displaying hunk", hunk_offsets.display(old_content, new_content), sep="\n")
             if hunk_offsets.deleted_byte_range is not None:
                 deletes.update(map(JavaIdentifier.from_bottommost_hierarchy, old_hierch_matcher.find_range(
                     hunk_offsets.deleted_byte_range[0], 
@@ -18,8 +18,9 @@
 
 """
 import re
+import sys
 from enum import IntEnum, auto
-from typing import Iterable, Iterator, NamedTuple, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, NamedTuple, List, Optional, Tuple, Union
 from .java_type import JavaFile, JavaHierarchy, JavaClass, JavaMethod
 import logging
 
@@ -57,7 +58,7 @@ OPENING_TO_CLOSING_SEP = {
     "{": "}",
     "[": "]"
 }
-OPENING_SEP = OPENING_TO_CLOSING_SEP.keys()
+OPENING_SEP = frozenset(OPENING_TO_CLOSING_SEP)
 
 class TokenType(IntEnum):
     """ Based on https://docs.oracle.com/javase/specs/jls/se17/html/jls-3.html#jls-3.5 """
@@ -68,15 +69,36 @@ class TokenType(IntEnum):
     OPERATOR = auto()
 
 
-st_token_type_to_int = {
-    f"g{int(variant)}": variant for variant in TokenType
-}
-
 class Token(NamedTuple):
     type: TokenType
     value: str
     pos: int
 
+def match_brackets(tokens: List[Token]) -> List[int]:
+    """ Maps each token index holding an opening paren/bracket to the index of its closing
+        counterpart, in a single pass over the tokens. Every kind of bracket is matched independently
+        of the others, and tokens that aren't matched openers are mapped to -1.
+    """
+    closing_ix = [-1] * len(tokens)
+    # maps every opener/closer to the stack of unmatched openers of its kind, and whether it opens,
+    # so each token costs a single lookup
+    bracket_roles: Dict[str, Tuple[List[int], bool]] = {}
+    for opener, closer in OPENING_TO_CLOSING_SEP.items():
+        opener_stack: List[int] = []
+        bracket_roles[opener] = (opener_stack, True)
+        bracket_roles[closer] = (opener_stack, False)
+
+    for i, token in enumerate(tokens):
+        role = bracket_roles.get(token.value)
+        if role is None:
+            continue
+        stack, is_opener = role
+        if is_opener:
+            stack.append(i)
+        elif stack:
+            closing_ix[stack.pop()] = i
+    return closing_ix
+
 # Comments and whitespace are completley ignored
 IGNORED = [
     r"//[^\n]*",
@@ -89,38 +111,70 @@ STRING_LITERAL = r'"(?:[^"\\]|\\.)*"'
 
 # Contains a few tokens of interest - not exhaustive. Mostly used to avoid accidentally
 # capturing elements we care about(like class keywords) used in other contexts(e.g, a literal)
+# Keywords are lexed as identifiers, and then told apart via `KEYWORD_TO_INTERNED`
 TERMINALS_OF_INTEREST = {
     TokenType.LITERAL: "|".join([CHAR_LITERAL, STRING_LITERAL]),
-    TokenType.KEYWORD: rf'\b(?:{"|".join(re.escape(kw) for kw in KEYWORDS)})\b',
-    TokenType.OPERATOR: rf'(?:{"|".join(re.escape(op) for op in OPERATORS)})',
-    TokenType.SEPARATOR: rf'(?:{"|".join(re.escape(sep) for sep in SEPARATORS)})',
+    # longest first, so that e.g '...' isn't lexed as three '.'
+    TokenType.OPERATOR: rf'(?:{"|".join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True))})',
+    TokenType.SEPARATOR: rf'(?:{"|".join(re.escape(sep) for sep in sorted(SEPARATORS, key=len, reverse=True))})',
     TokenType.IDENTIFIER: r"\b[A-Za-z_$][A-Za-z_$0-9]*\b",
 }
 
-assert set(TERMINALS_OF_INTEREST.keys()) == set(list(TokenType))
+assert set(TERMINALS_OF_INTEREST.keys()) == set(list(TokenType)) - {TokenType.KEYWORD}
+
+# Maps each keyword to an interned copy of itself, so keyword token values can be compared by identity
+KEYWORD_TO_INTERNED: Dict[str, str] = {sys.intern(kw): sys.intern(kw) for kw in KEYWORDS}
+
+def _compile_lexer_regex() -> Tuple[re.Pattern, Tuple[Optional[TokenType], ...]]:
+    """ Combines all terminals into a single regex, returning it along with a tuple mapping
+        each of its groups to the token type of the corresponding terminal """
+    # Each terminal gets its own capturing group(the terminal regexes themselves only use
+    # non-capturing groups), so a match's `lastindex` tells us which terminal was matched,
+    # which is cheaper than looking up the group by name. Index 0 and the ignored group map to None.
+    regexes = []
+    group_to_type: List[Optional[TokenType]] = [None]
+    for token_type, regex in TERMINALS_OF_INTEREST.items():
+        regexes.append(f"({regex})")
+        group_to_type.append(token_type)
+    ignored_regex = "|".join(IGNORED)
+    regexes.append(f"({ignored_regex})")
+    group_to_type.append(None)
+    # (not compiled with re.ASCII - '\b' must treat the decoded bytes of non-ASCII identifiers as word
+    # characters, otherwise their ASCII parts are lexed as identifiers of their own)
+    regex = re.compile("|".join(regexes))
+    assert regex.groups == len(group_to_type) - 1
+    return regex, tuple(group_to_type)
+
+# Compiled once at import and shared by all lexers
+LEXER_REGEX, LEXER_GROUP_TO_TYPE = _compile_lexer_regex()
 
 class JavaLexer():
     """ Regex based lexer that partially handles Java """
     def __init__(self):
-        regexes = []
-        for group, regex in TERMINALS_OF_INTEREST.items():
-            regexes.append(rf"(?P<g{group}>{regex})")
-        ignored_regex = "|".join(IGNORED)
-        regexes.append(rf"(?P<ignored>{ignored_regex})")
-        self.regex = re.compile("|".join(regexes))
+        self.regex = LEXER_REGEX
+        self.group_to_type = LEXER_GROUP_TO_TYPE
 
     def lex(self, text: str) -> Iterator[Token]:
+        group_to_type = self.group_to_type
+        identifier_type, keyword_type = TokenType.IDENTIFIER, TokenType.KEYWORD
+        get_keyword = KEYWORD_TO_INTERNED.get
         for match in self.regex.finditer(text):
-            group = match.lastgroup
-            if group == "ignored":
+            group = match.lastindex
+            token_type = group_to_type[group]
+            if token_type is None:
                 continue
-            token_type = st_token_type_to_int[group]
             value = match.group(group)
-            yield Token(token_type, value, pos=match.start())
+            if token_type is identifier_type:
+                keyword = get_keyword(value)
+                if keyword is not None:
+                    token_type, value = keyword_type, keyword
+            yield Token(token_type, value, match.start())
 
 
 
-CLASS_KEYWORDS = set(["class", "interface", "enum"])
+# Keyword token values are interned by the lexer, so membership tests against these mostly
+# succeed on identity alone
+CLASS_KEYWORDS = frozenset(map(sys.intern, ["class", "interface", "enum"]))
 
 class ParseException(Exception):
     pass
@@ -140,12 +194,14 @@ class JavaParser:
     """ Parses class and method declarations in a Java file """
     def __init__(self):
         self.tokens: List[Token] = []
+        # index of the closing bracket for every opening bracket token, see `match_brackets`
+        self.closing_bracket_ix: List[int] = []
         self.lexer = JavaLexer()
         self.text = ""
 
     def parse_java(self, text: str) -> JavaHierarchy:
         self.text = text
-        self.tokens = list(self.lexer.lex(text))
+        self._set_tokens(list(self.lexer.lex(text)))
         return self._parse_file()
 
     def parse_java_bytes(self, contents: bytes) -> JavaHierarchy:
@@ -162,22 +218,22 @@ class JavaParser:
 
     def _set_tokens(self, tokens: List[Token]):
         self.tokens = tokens
+        self.closing_bracket_ix = match_brackets(tokens)
     
     def _parse_file(self) -> JavaHierarchy:
+        tokens = self.tokens
+        n_tokens = len(tokens)
         i = 0
         package_name = UNKNOWN_PACKAGE_NAME
         members = []
         try:
-            while i < len(self.tokens):
-                if (self.tokens[i].type == TokenType.KEYWORD and
-                    self.tokens[i].value == "package"
-                    ):
+            while i < n_tokens:
+                token_type, value, _pos = tokens[i]
+                if token_type == TokenType.KEYWORD and value == "package":
                     i, package = self._parse_dot_delimited_identifiers(i + 1)
                     package_name = ".".join(package)
 
-                elif (self.tokens[i].type == TokenType.KEYWORD and
-                    self.tokens[i].value in CLASS_KEYWORDS
-                    ):
+                elif token_type == TokenType.KEYWORD and value in CLASS_KEYWORDS:
                     class_end_brack, clazz = self._try_parse_class(i)
                     i = class_end_brack + 1
                     if clazz is not None:
@@ -195,14 +251,16 @@ class JavaParser:
         """ Parses a list of dot delimited identifiers starting at given token index,
             returns them tupled with the index past the last parsed token. """
         
-        assert self.tokens[pos].type == TokenType.IDENTIFIER
-        idents = [self.tokens[pos].value]
+        tokens = self.tokens
+        n_tokens = len(tokens)
+        assert tokens[pos].type == TokenType.IDENTIFIER
+        idents = [tokens[pos].value]
         next_tok = pos + 1
-        while next_tok < len(self.tokens) and self.tokens[next_tok].value == ".":
-            if self.tokens[next_tok + 1].type != TokenType.IDENTIFIER:
-                raise UnexpectedElement("Expected identifier after dot, got ",
+        while next_tok < n_tokens and tokens[next_tok].value == ".":
+            if next_tok + 1 == n_tokens or tokens[next_tok + 1].type != TokenType.IDENTIFIER:
+                raise UnexpectedElement("Expected identifier after dot, got "
                                         f"{self[next_tok + 1]} instead")
-            idents.append(self.tokens[next_tok + 1].value)
+            idents.append(tokens[next_tok + 1].value)
             next_tok = next_tok + 2
         
         return next_tok, idents
@@ -222,7 +280,7 @@ class JavaParser:
                                     f"instead got {self[pos+1]}")
         class_type = self.tokens[pos].value
         name = self.tokens[pos + 1].value
-        log.debug(f"Parsing class of type {class_type}, name: {name}")
+        log.debug("Parsing class of type %s, name: %s", class_type, name)
 
         # finding the opening bracket - there may be generic or extends/implements inbetween
         brack_ix = self._skip_to(pos + 2, TokenType.SEPARATOR, "{")
@@ -253,7 +311,8 @@ class JavaParser:
             or even a lambda
             var lambdaDef = (int a, int b) -> {};
         """
-        log.debug(f"Trying to parse suspected method whose paren begins at {open_paren_ix}, lower bound: {lower_bound}, belonging to class type {class_kind}")
+        log.debug("Trying to parse suspected method whose paren begins at %d, lower bound: %d, belonging to class type %s",
+                  open_paren_ix, lower_bound, class_kind)
         closing_paren_ix = self._find_closing_bracket(open_paren_ix)
         opening_brack_or_sc_ix = self._skip_to(closing_paren_ix + 1, TokenType.SEPARATOR, [";", "{"])
         if open_paren_ix - 1 < 0 or self.tokens[open_paren_ix - 1].type != TokenType.IDENTIFIER:
@@ -276,15 +335,23 @@ class JavaParser:
             the target value being skipped to), will skip towards the matching closing bracket - ignoring everything between.
             it.
             """
+        tokens = self.tokens
+        closing_bracket_ix = self.closing_bracket_ix
+        n_tokens = len(tokens)
+        separator_type = TokenType.SEPARATOR
         i = from_pos
-        while i < len(self.tokens):
-            if self.tokens[i].type == token_type and self.tokens[i].value in values:
+        while i < n_tokens:
+            cur_type, value, _pos = tokens[i]
+            if cur_type == token_type and value in values:
                 return i
-            elif self.tokens[i].type == TokenType.SEPARATOR and self.tokens[i].value in OPENING_TO_CLOSING_SEP.keys():
+            elif cur_type == separator_type and value in OPENING_SEP:
                 # if i - 1 > 0 and self.tokens[i].value == "{" and self.tokens[i-1].value != "->":
                 #     ctx = self.text[self.tokens[i-10].pos : self.tokens[i+10].pos]
                 #     log.warn(f"Skipped a block that does not follow a lambda, context: {ctx}")
-                i = self._find_closing_bracket(i) + 1
+                closing_ix = closing_bracket_ix[i]
+                if closing_ix < 0:
+                    raise NoMatchingParen(f"Found un-matched paren/bracket starting at position {i}")
+                i = closing_ix + 1
             else:
                 i += 1
 
@@ -294,12 +361,14 @@ class JavaParser:
     def _try_skip_annotation(self, at_symbol_pos: int) -> int:
         """ Tries to parse an annotation given the position of the "@" token, 
             and returns the token index after that annotation, or just one past the given index if no annotation was parsed."""
-        if at_symbol_pos + 1 == len(self.tokens):
+        tokens = self.tokens
+        n_tokens = len(tokens)
+        if at_symbol_pos + 1 == n_tokens:
             return at_symbol_pos + 1
-        if self.tokens[at_symbol_pos + 1].value == "interface":
+        if tokens[at_symbol_pos + 1].value == "interface":
             # @interface is an annotation definition, which we will parse as a class
             return at_symbol_pos + 1
-        elif self.tokens[at_symbol_pos + 1].type != TokenType.IDENTIFIER:
+        elif tokens[at_symbol_pos + 1].type != TokenType.IDENTIFIER:
             raise UnexpectedElement(("Expected 'interface' or identifier after '@' symbol, "
                                      f"got {self[at_symbol_pos + 1]} instead"))
         
@@ -307,13 +376,13 @@ class JavaParser:
         # cannot be generic, so it's basically dot delimited identifiers
 
         after_ident_pos = at_symbol_pos + 2
-        while after_ident_pos < len(self.tokens) and self.tokens[after_ident_pos].value == ".":
-            if after_ident_pos + 1 == len(self.tokens) or self.tokens[after_ident_pos + 1].type != TokenType.IDENTIFIER:
+        while after_ident_pos < n_tokens and tokens[after_ident_pos].value == ".":
+            if after_ident_pos + 1 == n_tokens or tokens[after_ident_pos + 1].type != TokenType.IDENTIFIER:
                 raise UnexpectedElement("Expected identifier after dot separator, got "
                                         f"{self[after_ident_pos + 1]} instead")
             after_ident_pos = after_ident_pos + 2
         
-        if after_ident_pos < len(self.tokens) and self.tokens[after_ident_pos].value == "(":
+        if after_ident_pos < n_tokens and tokens[after_ident_pos].value == "(":
             # annotation with parameter list - skip to end of list
             closing_paren = self._find_closing_bracket(after_ident_pos)
             return closing_paren + 1
@@ -325,17 +394,20 @@ class JavaParser:
             Returns the index of the closing bracket tupled with a list of parsed members, or -1 as index
             if no closing bracket was found.
         """
+        tokens = self.tokens
+        n_tokens = len(tokens)
+        separator_type, keyword_type, operator_type = TokenType.SEPARATOR, TokenType.KEYWORD, TokenType.OPERATOR
         members: List[JavaHierarchy] = []
         i = pos_after_brack
         min_bound = pos_after_brack
-        while i < len(self.tokens):
+        while i < n_tokens:
             try:
-                token = self.tokens[i]
+                token_type, value, _pos = tokens[i]
                 # reached end of current member block
-                if token.type == TokenType.SEPARATOR and token.value == "}":
+                if token_type == separator_type and value == "}":
                     return i, members
                 # We almost definitely have a class
-                if token.type == TokenType.KEYWORD and token.value in CLASS_KEYWORDS:
+                if token_type == keyword_type and value in CLASS_KEYWORDS:
                     i, clazz = self._try_parse_class(i)
                     i += 1
                     if clazz is not None:
@@ -343,13 +415,13 @@ class JavaParser:
                         min_bound = i
                 # We skip field assignment (as it may have a parameter list due to function invocation, 
                 # # or a lambda definition which could confuse the parser)
-                elif token.type == TokenType.OPERATOR and token.value == "=":
+                elif token_type == operator_type and value == "=":
                     i = self._skip_to(i + 1, TokenType.SEPARATOR, (";",)) + 1
                 # skip an annotation (as it may have a parameter list)
-                elif token.type == TokenType.SEPARATOR and token.value == "@":
+                elif token_type == separator_type and value == "@":
                     i = self._try_skip_annotation(i)
                 # We have a function call (based on parameter list)
-                elif token.type == TokenType.SEPARATOR and token.value == "(":
+                elif token_type == separator_type and value == "(":
                     i, method = self._try_parse_method(class_type, i, min_bound)
                     i += 1
                     if method is not None:
@@ -358,7 +430,7 @@ class JavaParser:
                 
                 # We found a block that doesn't belong to a class or method(e.g, a static block or
                 # a lambda function declaration), skip to the block's ending.
-                elif token.type == TokenType.SEPARATOR and token.value == "{":
+                elif token_type == separator_type and value == "{":
                     i = self._find_closing_bracket(i) + 1
                     min_bound = i
                 else:
@@ -376,20 +448,10 @@ class JavaParser:
 
     def _find_closing_bracket(self, starting_bracket_pos: int) -> int:
         """ Given the position of a starting paren/bracket, finds the index of the corresponding ending
-            bracket. Returns None if no closing bracket is found. """
+            bracket. Raises `NoMatchingParen` if no closing bracket is found. """
         assert (self.tokens[starting_bracket_pos].value in OPENING_SEP)
-        starter = self.tokens[starting_bracket_pos].value
-        closer = OPENING_TO_CLOSING_SEP[starter]
-
-        n_nested_openers = 1
-        for i in range(starting_bracket_pos + 1, len(self.tokens)):
-            token = self.tokens[i]
-            if token.value == starter:
-                n_nested_openers += 1
-            elif token.value == closer:
-                n_nested_openers -= 1
-                if n_nested_openers == 0:
-                    return i
-        raise NoMatchingParen(f"Found un-matched paren/bracket starting at position {starting_bracket_pos}, "
-                              f"number of nested openers: {n_nested_openers}")
+        closing_ix = self.closing_bracket_ix[starting_bracket_pos]
+        if closing_ix < 0:
+            raise NoMatchingParen(f"Found un-matched paren/bracket starting at position {starting_bracket_pos}")
+        return closing_ix
 
@@ -9,6 +9,7 @@ from __future__ import annotations
 from typing import NamedTuple, List, Optional, Union, Iterator, Tuple
 from enum import IntEnum, auto
 from functools import partial
+import sys
 
 class HierarchyType(IntEnum):
     package = auto()
@@ -39,27 +40,46 @@ class JavaHierarchy:
     members: List[JavaHierarchy]
     parent: Optional[JavaHierarchy]
     kind: HierarchyType
-    __slots__ = ['start', 'end', 'name', 'kind', 'members', 'parent']
+    # identifier of this node, computed on first use by `JavaIdentifier.from_bottommost_hierarchy`
+    _identifier: Optional[JavaIdentifier]
+    # nodes of this subtree in DFS preorder, computed on first use by `iterate_dfs_preorder`
+    _preorder: Optional[List[JavaHierarchy]]
+    __slots__ = ['start', 'end', 'name', 'kind', 'members', 'parent', '_identifier', '_preorder']
 
     def __init__(self, name: str, kind: HierarchyType, start: int, end: int, parent: Optional[JavaHierarchy] = None,
                  members: Optional[List[JavaHierarchy]] = None):
-        self.name = name
+        # names repeat a lot across files(e.g, package names, common method names), so we share a
+        # single copy of each
+        self.name = sys.intern(name)
         self.kind = kind
         self.start = start
         self.end = end
         self.parent = parent
         self.members = [] if members is None else members
+        self._identifier = None
+        self._preorder = None
 
     def iterate_dfs_preorder(self) -> Iterator[JavaHierarchy]:
         """ Traverses the Java hierarchy in a DFS preorder (a topological sort), note that
             this ordering goes over the Java hierarchy elements by the order in which their declarations appear.
+
+            The ordering is computed once and cached on the node, so members shouldn't be added or
+            removed from the subtree after it was traversed.
         """
-        stack = [self]
-        while len(stack) > 0:
-            parent = stack.pop()
-            if parent.members:
-                stack.extend(reversed(parent.members))
-            yield parent
+        preorder = self._preorder
+        if preorder is None:
+            preorder = []
+            append = preorder.append
+            stack = [self]
+            pop = stack.pop
+            extend = stack.extend
+            while stack:
+                parent = pop()
+                append(parent)
+                if parent.members:
+                    extend(parent.members[::-1])
+            self._preorder = preorder
+        return iter(preorder)
 
     def iterate_up_to_parents(self) -> Iterator[JavaHierarchy]:
         cur = self
@@ -81,15 +101,41 @@ class JavaIdentifier:
 
     # Java hierarchy kinds and identifiers, from most specific to most general.
     hierarchies: Tuple[Tuple[HierarchyType, str], ...]
-    __slots__ = ['hierarchies']
+    # identifiers are mostly used as set/dict keys, so the hash is computed once
+    _hash: int
+    __slots__ = ['hierarchies', '_hash']
 
     def __init__(self, hierarchies: Tuple[Tuple[HierarchyType, str], ...]):
         self.hierarchies = hierarchies
+        self._hash = hash(hierarchies)
+
+    def __reduce__(self):
+        # string hashes differ between processes, so only the hierarchies are pickled and the
+        # hash is recomputed when unpickling
+        return (JavaIdentifier, (self.hierarchies,))
+
+    def __setstate__(self, state):
+        # identifiers pickled before `_hash` existed only carry their slots' state
+        _dict_state, slots_state = state
+        self.__init__(slots_state["hierarchies"])
 
     @staticmethod
-    def from_bottommost_hierarchy(bottommost_hierarchy: JavaHierarchy):
-        return JavaIdentifier(tuple((hierch.kind, hierch.name)
-                                    for hierch in bottommost_hierarchy.iterate_up_to_parents()))
+    def from_bottommost_hierarchy(bottommost_hierarchy: JavaHierarchy) -> JavaIdentifier:
+        """ Creates the identifier of the given hierarchy node. The identifier is cached on the node, since
+            the same nodes are identified many times over when matching changes, therefore nodes
+            shouldn't be renamed or moved in the tree once identified.
+        """
+        identifier = bottommost_hierarchy._identifier
+        if identifier is None:
+            # same as walking `iterate_up_to_parents`, without the generator overhead
+            hierarchies = []
+            cur = bottommost_hierarchy
+            while cur is not None:
+                hierarchies.append((cur.kind, cur.name))
+                cur = cur.parent
+            identifier = JavaIdentifier(tuple(hierarchies))
+            bottommost_hierarchy._identifier = identifier
+        return identifier
 
     @property
     def identifier_type(self) -> HierarchyType:
@@ -102,7 +148,7 @@ class JavaIdentifier:
         return repr(self.hierarchies)
 
     def __hash__(self) -> int:
-        return hash(self.hierarchies)
+        return self._hash
 
     def __eq__(self, o: object) -> bool:
         if isinstance(o, JavaIdentifier):
@@ -3,7 +3,18 @@ import pandas as pd
 from pathlib import Path
 from typing import NamedTuple, Mapping, Any
 from git_analysis.java_type import HierarchyType
-import json
+import orjson
+import hashlib
+
+def hash_attrs(attrs: Mapping[str, Any]) -> int:
+    """ A hash identifying the parameters a graph was generated with(not the graph's contents -
+        graphs generated from the same parameters at different times share it, so it shouldn't be
+        used as a cache key for the graph itself).
+        Unlike the builtin 'hash', which is salted per process, this is stable across runs,
+        so it can be persisted in 'meta.json'.
+    """
+    digest = hashlib.blake2b(orjson.dumps(attrs, option=orjson.OPT_SORT_KEYS), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
 
 class GraphData(NamedTuple):
     """ An unprocessed graph of Java hierarchies, whether made from git analysis or
@@ -17,7 +28,7 @@ class GraphData(NamedTuple):
     # callgraph/git changes
     type: str
 
-    # hash of the parameters, for caching
+    # hash of the parameters(see `hash_attrs`), doesn't cover the graph's contents
     hash: int
 
     # parameters used in generating the graph
@@ -29,10 +40,9 @@ class GraphData(NamedTuple):
         node_map_path = folder / "mapping.json"
         meta_path = folder / "meta.json"
 
-        edges = pd.read_json(edges_path, encoding='utf-8', orient="records")
-        node_map = pd.read_json(node_map_path, encoding='utf-8', orient='index')
-        with open(meta_path, 'r', encoding='utf-8') as meta_file:
-            meta_obj = json.load(meta_file)
+        edges = _nulls_to_nan(pd.DataFrame(orjson.loads(edges_path.read_bytes())))
+        node_map = _nulls_to_nan(pd.DataFrame.from_dict(orjson.loads(node_map_path.read_bytes()), orient='index'))
+        meta_obj = orjson.loads(meta_path.read_bytes())
         cg = GraphData(
             edges=edges,
             vertices=node_map,
@@ -49,19 +59,30 @@ class GraphData(NamedTuple):
         node_map_path = folder / "mapping.json"
         meta_path = folder / "meta.json"
 
-        self.edges.to_json(edges_path, orient="records")
-        self.vertices.to_json(node_map_path, orient="index")
+        # (same layouts as pandas' to_json with orient "records" and "index")
+        edges_path.write_bytes(orjson.dumps(self.edges.to_dict(orient="records"),
+                                            option=orjson.OPT_SERIALIZE_NUMPY))
+        node_map_path.write_bytes(orjson.dumps(self.vertices.to_dict(orient="index"),
+                                               option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
 
-        with open(meta_path, 'w', encoding='utf-8') as meta_file:
-            json.dump({
+        with open(meta_path, 'wb') as meta_file:
+            meta_file.write(orjson.dumps({
                 "type": self.type,
                 "hierch": self.hierch.name,
                 "attrs": self.attrs,
                 "hash": self.hash
-            }, meta_file)
+            }))
+
 
 
 
+def _nulls_to_nan(df: pd.DataFrame) -> pd.DataFrame:
+    """ Columns whose values are all null(e.g, 'conviction' when all its values are infinite, which
+        are written as null) are loaded with None values, these are converted to float NaN
+        columns, like 'pd.read_json' does """
+    for col in df.columns[df.isna().all()]:
+        df[col] = pd.to_numeric(df[col])
+    return df
 
 def path_contains_graph(path: Path) -> bool:
     return ((path / "edges.json").exists() and
@@ -9,7 +9,9 @@ import igraph
 from .graph_data import GraphData
 from git_analysis.java_type import HierarchyType
 from pathlib import Path
+from itertools import repeat
 import pandas as pd
+import numpy as np
 
 class ConversionArgs(NamedTuple):
     hierch: Union[HierarchyType, str]
@@ -42,6 +44,59 @@ GRAPH_COLORS = [
     "#F13A13", # Vivid Reddish Orange
     "#232C16", # Dark Olive Green
 ]
+GRAPH_COLORS_ARR = np.asarray(GRAPH_COLORS)
+
+def _edge_weights(edges: pd.DataFrame) -> Union[pd.Series, int]:
+    """ Association rules are weighted by confidence, otherwise all edges have the same weight """
+    if "weight" in edges.columns:
+        return edges["weight"]
+    if "confidence" in edges.columns:
+        return edges["confidence"]
+    return 1
+
+def _build_contracted_graph(raw: GraphData, sources: np.ndarray, targets: np.ndarray,
+                            contraction: str) -> igraph.Graph:
+    """ Builds the graph whose vertices are the groups of raw vertices having the same value of the
+        'contraction' attribute('package' or 'class'), given the raw edges as vertex indices.
+
+        Edges are aggregated in pandas before building the graph, giving the same result as building the
+        full graph, removing duplicate edges and self loops, contracting vertices, and then summing
+        the weights of parallel edges while removing the new self loops:
+        each group's attributes are taken from its first vertex, and an edge's weight is the sum of
+        the weights of the distinct raw edges between the two groups.
+    """
+    weight = _edge_weights(raw.edges)
+    edges = pd.DataFrame({
+        "source": sources,
+        "target": targets,
+        "weight": weight.to_numpy() if isinstance(weight, pd.Series) else weight
+    })
+    edges = edges[edges["source"] != edges["target"]].drop_duplicates(["source", "target"], keep="first")
+
+    # groups are numbered by order of first appearance, like the vertices of a contracted igraph
+    group_of_vertex, _ = pd.factorize(raw.vertices[contraction], sort=False)
+    edges = pd.DataFrame({
+        "source": group_of_vertex[edges["source"].to_numpy()],
+        "target": group_of_vertex[edges["target"].to_numpy()],
+        "weight": edges["weight"].to_numpy()
+    })
+    edges = edges[edges["source"] != edges["target"]]
+    edges = edges.groupby(["source", "target"], sort=True)["weight"].sum().reset_index()
+
+    first_vertex_of_group = np.flatnonzero(~pd.Series(group_of_vertex).duplicated().to_numpy())
+    group_vertices = raw.vertices.iloc[first_vertex_of_group]
+
+    graph = igraph.Graph(n=len(group_vertices),
+                         edges=list(zip(edges["source"].tolist(), edges["target"].tolist())),
+                         directed=True)
+    graph.vs["package"] = group_vertices["package"].tolist()
+    if contraction == "class":
+        graph.vs["class"] = group_vertices["class"].tolist()
+        graph.vs["name"] = group_vertices["package"].str.cat(group_vertices["class"], sep=".").tolist()
+    else:
+        graph.vs["name"] = graph.vs["package"]
+    graph.es["weight"] = edges["weight"].tolist()
+    return graph
 
 def raw_graph_to_igraph(raw: GraphData, args: ConversionArgs) -> Tuple[igraph.Graph, igraph.VertexClustering]:
     """ Converts a graph (whether a call graph or a graph from association rules)
@@ -56,52 +111,50 @@ def raw_graph_to_igraph(raw: GraphData, args: ConversionArgs) -> Tuple[igraph.Gr
     assert hierch in raw.hierch.included(), "cannot constrict a graph into a higher hierarchy than its own"
 
     edges = raw.edges
-    if "weight" in raw.edges.columns:
-        edges["weight"] = raw.edges["weight"]
-    elif "confidence" in raw.edges.columns:
-        edges["weight"] = raw.edges["confidence"]
-    else:
-        edges["weight"] = 1
-    vertices = raw.vertices.reset_index()
-
-    graph = igraph.Graph.DataFrame(edges, directed=True,
-                                    vertices=vertices)
-
-    # Note: parallel edges/self loops not possible in association rule model
-    # so this explanation is only relevant for call graph:
-    #
-    # We consider duplicate calls from one method to another, or self loops(recursive methods)
-    # an implementation detail and not something that hints a stronger function depdenency, so
-    # we remove them.
-    graph.simplify(multiple=True, loops=True, combine_edges="first")
+
+    # The first two edge columns are the names of the source and target vertices, which
+    # we convert to vertex indices
+    vertex_names = raw.vertices.index
+    sources = vertex_names.get_indexer(edges.iloc[:, 0])
+    targets = vertex_names.get_indexer(edges.iloc[:, 1])
+    if (sources < 0).any() or (targets < 0).any():
+        raise ValueError("Some vertices in the edges DataFrame are missing from the vertices DataFrame")
+
     contraction = {
         HierarchyType.method: None,
         HierarchyType.type_def: "class",
         HierarchyType.package: "package",
     }[hierch]
     if contraction:
-        combine_attrs = {
-            "package": "first"
-        }
-        if contraction == "class":
-            combine_attrs["class"] = "first"
-        mapping_vector, _ = pd.factorize(graph.vs[contraction], sort=False)
-        graph.contract_vertices(mapping_vector, combine_attrs)
-
-        # calculate a new "name" attribute
-        if contraction == "class":
-            graph.vs["name"] = pd.Series(graph.vs["package"]).apply(lambda s: s+".") + graph.vs["class"]
-        else:
-            graph.vs["name"] = graph.vs["package"]
-
-        graph.simplify(multiple=True, loops=True, combine_edges={"weight": "sum"})
+        graph = _build_contracted_graph(raw, sources, targets, contraction)
+    else:
+        graph = igraph.Graph(n=len(vertex_names), edges=list(zip(sources.tolist(), targets.tolist())),
+                             directed=True)
+        graph.vs["name"] = vertex_names.tolist()
+        for col in raw.vertices.columns:
+            graph.vs[col] = raw.vertices[col].tolist()
+        for col in edges.columns[2:]:
+            graph.es[col] = edges[col].tolist()
+        if "weight" not in edges.columns:
+            weight = _edge_weights(edges)
+            graph.es["weight"] = weight.tolist() if isinstance(weight, pd.Series) else weight
+
+        # Note: parallel edges/self loops not possible in association rule model
+        # so this explanation is only relevant for call graph:
+        #
+        # We consider duplicate calls from one method to another, or self loops(recursive methods)
+        # an implementation detail and not something that hints a stronger function depdenency, so
+        # we remove them.
+        graph.simplify(multiple=True, loops=True, combine_edges="first")
 
     # page rank for node importance
     graph.vs["pr"] = graph.pagerank(directed=True, weights="weight", damping=args.damping_factor,
                                     implementation="prpack")
-    pr = pd.Series(graph.vs["pr"])
-    norm_pr = (pr - pr.min()) / (pr.max() - pr.min())
-    graph.vs["size"] = 16 + norm_pr * 30 
+    pr = np.asarray(graph.vs["pr"])
+    pr_min, pr_max = (pr.min(), pr.max()) if len(pr) > 0 else (0.0, 0.0)
+    # (all nodes have the same page rank, e.g. in a graph with a single node)
+    pr_range = pr_max - pr_min if pr_max > pr_min else 1.0
+    graph.vs["size"] = (16 + (pr - pr_min) / pr_range * 30).tolist()
 
     undirected = graph.as_undirected(mode='collapse', combine_edges={'weight': 'sum'})
     clustering = undirected.community_leiden(n_iterations=args.community_iters,
@@ -109,7 +162,8 @@ def raw_graph_to_igraph(raw: GraphData, args: ConversionArgs) -> Tuple[igraph.Gr
                                              objective_function='modularity',
                                              weights='weight')
     graph.vs["community"] = clustering.membership
-    graph.vs["color"] = [GRAPH_COLORS[c % len(GRAPH_COLORS)] for c in clustering.membership]
+    # (colors are reused cyclically when there are more communities than colors)
+    graph.vs["color"] = np.take(GRAPH_COLORS_ARR, clustering.membership, mode="wrap").tolist()
 
     return graph, clustering
 
@@ -139,12 +193,60 @@ def igraph_edge_to_cyto(g: igraph.Graph, edge: igraph.Edge, classes: Optional[Li
         "classes": " ".join(classes or [])
     }
 
+def igraph_verts_to_cyto(g: igraph.Graph, verts: Optional[Iterable[igraph.Vertex]] = None,
+                         classes: Optional[List[str]]=None) -> List[dict]:
+    """ Like `igraph_vert_to_cyto`, for many vertices at once(by default, all of the graph's vertices).
+        Attributes are fetched a column at a time rather than per vertex. """
+    if verts is None:
+        verts = g.vs
+    elif not isinstance(verts, igraph.VertexSeq):
+        indices = [vert.index for vert in verts]
+        if not indices:
+            return []
+        verts = g.vs.select(indices)
+    attr_names = verts.attribute_names()
+    columns = [verts[attr] for attr in attr_names]
+    classes_st = " ".join(classes or [])
+    elements = []
+    for values in zip(*columns):
+        data = dict(zip(attr_names, values))
+        data["id"] = data["label"] = data["name"]
+        elements.append({
+            "data": data,
+            "classes": classes_st
+        })
+    return elements
+
+def igraph_edges_to_cyto(g: igraph.Graph, edges: Optional[Iterable[igraph.Edge]] = None,
+                         classes: Optional[List[str]]=None) -> List[dict]:
+    """ Like `igraph_edge_to_cyto`, for many edges at once(by default, all of the graph's edges).
+        Attributes are fetched a column at a time rather than per edge. """
+    if edges is None:
+        edge_seq = g.es
+        endpoints = g.get_edgelist()
+    else:
+        edges = list(edges)
+        if not edges:
+            return []
+        edge_seq = g.es.select([edge.index for edge in edges])
+        endpoints = [(edge.source, edge.target) for edge in edge_seq]
+    attr_names = edge_seq.attribute_names()
+    columns = [edge_seq[attr] for attr in attr_names]
+    vertex_names = g.vs["name"]
+    classes_st = " ".join(classes or [])
+    elements = []
+    for (source, target), values in zip(endpoints, zip(*columns) if columns else repeat(())):
+        data = dict(zip(attr_names, values))
+        data["source"] = vertex_names[source]
+        data["target"] = vertex_names[target]
+        elements.append({
+            "data": data,
+            "classes": classes_st
+        })
+    return elements
+
 def igraph_to_cyto(graph: igraph.Graph):
-    return [
-        igraph_vert_to_cyto(graph, vert) for vert in graph.vs
-    ] + [
-        igraph_edge_to_cyto(graph, edge) for edge in graph.es
-    ]
+    return igraph_verts_to_cyto(graph) + igraph_edges_to_cyto(graph)
 
 
 def get_filtered_edges(elements, new_edges: Iterable[igraph.Edge]) -> Iterable[igraph.Edge]:
@@ -1,7 +1,68 @@
-from git_analysis.git_processor import git_repo_to_folder, git_repo_to_owner_and_repo
+from git_analysis.git_processor import GitProcessor, git_repo_to_folder, git_repo_to_owner_and_repo
+from pathlib import Path
+import pygit2
 
 def test_repo_url():
     assert git_repo_to_folder("git@github.com:skylot/jadx.git") == "jadx"
     assert git_repo_to_owner_and_repo("git@github.com:skylot/jadx.git") == ("skylot", "jadx")
     assert git_repo_to_folder("https://github.com/skylot/jadx.git") == "jadx"
-    assert git_repo_to_owner_and_repo("git@github.com:skylot/jadx.git") == ("skylot", "jadx")
\ No newline at end of file
+    assert git_repo_to_owner_and_repo("git@github.com:skylot/jadx.git") == ("skylot", "jadx")
+
+JAVA_FILE_VERSIONS = [
+    """package com.needle.proj;
+    class Foo {
+        void first() {}
+    }
+    """,
+    """package com.needle.proj;
+    class Foo {
+        void first() { int x = 1; }
+        void second() {}
+    }
+    """,
+    """package com.needle.proj;
+    class Foo {
+        void first() { int x = 1; }
+        void second() { first(); }
+        class Bar {
+            void third() {}
+        }
+    }
+    """,
+    """package com.needle.proj;
+    class Foo {
+        void second() { first(); }
+        class Bar {
+            void third() { return; }
+        }
+    }
+    """
+]
+
+def create_test_repo(path: Path):
+    """ Creates a git repository with a commit for each version of a single Java file """
+    repo = pygit2.init_repository(str(path))
+    sig = pygit2.Signature("Tester", "tester@needle.com")
+    parents = []
+    for i, contents in enumerate(JAVA_FILE_VERSIONS):
+        (path / "Foo.java").write_text(contents)
+        repo.index.add("Foo.java")
+        repo.index.write()
+        tree = repo.index.write_tree()
+        commit = repo.create_commit("HEAD", sig, sig, f"Version {i}", tree, parents)
+        parents = [commit]
+
+def test_parallel_commit_processing(tmp_path: Path):
+    git_path = tmp_path / "test_repo"
+    create_test_repo(git_path)
+    url = "https://github.com/needle/test_repo.git"
+
+    with GitProcessor(url, str(git_path), str(tmp_path / "shelve_seq")) as git:
+        sequential, sequential_by_id = git.get_processed_commits(workers=1)
+    with GitProcessor(url, str(git_path), str(tmp_path / "shelve_par")) as git:
+        parallel, parallel_by_id = git.get_processed_commits(workers=2)
+
+    assert len(sequential) == len(JAVA_FILE_VERSIONS) - 1
+    assert any(patch.changes for commit in sequential for patch in commit["parsed_patches"])
+    assert parallel == sequential
+    assert parallel_by_id == sequential_by_id
@@ -33,4 +33,11 @@ def test_pos_to_java_unit_matcher():
     finder = PosToJavaUnitMatcher(tree)
     assert [h.name for h in finder.find_range(0, 106)] == ["F", "C1", "C1M1", "C1M2", "C2"]
     finder = PosToJavaUnitMatcher(tree)
-    assert [h.name for h in finder.find_range(0, 180)] == ["F", "C1", "C1M1", "C1M2", "C2", "C2M1", "C2M2"]
\ No newline at end of file
+    assert [h.name for h in finder.find_range(0, 180)] == ["F", "C1", "C1M1", "C1M2", "C2", "C2M1", "C2M2"]
+
+    finder = PosToJavaUnitMatcher(tree)
+    assert finder.find(160).name == "C2M2"
+    assert finder.find(41).name == "C1M2", "queries needn't be in ascending order"
+    assert finder.find(0).name == "F"
+    assert [h.name for h in finder.find_range(106, 180)] == ["C2", "C2M1", "C2M2"]
+    assert [h.name for h in finder.find_range(85, 106)] == ["C1", "C2"]
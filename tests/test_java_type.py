@@ -1,3 +1,4 @@
+import pickle
 from git_analysis.java_type import JavaFile, JavaClass, JavaMethod, HierarchyType, JavaIdentifier
 
 def test_dfs():
@@ -16,6 +17,8 @@ def test_dfs():
     tree.members.extend([c1,c2])
     names = [h.name for h in tree.iterate_dfs_preorder()]
     assert names == ["F", "C1", "C1M1", "C1M2", "C2", "C2M1", "C2M2"]
+    assert [h.name for h in tree.iterate_dfs_preorder()] == names, "cached traversal gives the same order"
+    assert [h.name for h in c2.iterate_dfs_preorder()] == ["C2", "C2M1", "C2M2"]
 
     f = JavaIdentifier.from_bottommost_hierarchy(tree)
     assert str(f) == "F"
@@ -25,6 +28,7 @@ def test_dfs():
 
     fc1 = JavaIdentifier.from_bottommost_hierarchy(c1)
     assert str(fc1) == "F.C1"
+    assert JavaIdentifier.from_bottommost_hierarchy(c1) is fc1, "identifiers are cached per node"
     assert fc1.as_class() == fc1
     assert fc1.as_method() is None
     assert str(fc1.as_package()) == "F"
@@ -36,4 +40,7 @@ def test_dfs():
     assert c2m2.identifier_type == HierarchyType.method
     assert c2m2.as_method() == c2m2
     assert str(c2m2.as_class()) == "F.C2"
-    assert str(c2m2.as_package()) == "F"
\ No newline at end of file
+    assert str(c2m2.as_package()) == "F"
+
+    unpickled = pickle.loads(pickle.dumps(c2m2))
+    assert unpickled == c2m2 and hash(unpickled) == hash(c2m2)
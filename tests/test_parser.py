@@ -1,4 +1,4 @@
-from git_analysis.java_decl_parser import JavaParser, JavaLexer
+from git_analysis.java_decl_parser import JavaParser, JavaLexer, match_brackets
 from pathlib import Path
 import re
 
@@ -105,4 +105,30 @@ def test_f1():
     f = TEST_FILE_PATH / "AttachTryCatchVisitor.java"
     bs = f.read_bytes()
     parser = JavaParser()
-    tree = parser.parse_java_bytes(bs)
\ No newline at end of file
+    tree = parser.parse_java_bytes(bs)
+
+def test_match_brackets():
+    txt = "( { [ ] ( ) } ) { ( }"
+    tok = list(JavaLexer().lex(txt))
+    closing_ix = match_brackets(tok)
+    assert closing_ix[:8] == [7, 6, 3, -1, 5, -1, -1, -1]
+    # the last brace is closed, the paren inside it never is
+    assert closing_ix[8:] == [10, -1, -1]
+
+def test_non_ascii_identifiers():
+    txt = """
+    package com.needle.proj
+    class Foo {
+        void café() {}
+        int überZahl() { return 1; }
+        void plain() {}
+    }
+    class Größe {
+    }
+    """
+    file = JavaParser().parse_java_bytes(txt.encode("utf-8"))
+    names = [member.name for member in file.iterate_dfs_preorder()]
+    # identifiers with non-ASCII characters aren't recognized, but their ASCII parts mustn't be
+    # mistaken for identifiers either
+    assert "Foo" in names
+    assert not {"caf", "berZahl", "Gr"} & set(names)
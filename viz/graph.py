@@ -428,11 +428,11 @@ def handle_add_nodes(state: GraphState, elements, num_nodes_to_add, add_edges_op
     new_node_names = node_names - existing_node_names
     new_nodes = state.graph.vs.select(name_in=new_node_names)
 
-    new_elements = elements + [igraph_vert_to_cyto(state.graph, node, []) for node in new_nodes ]
+    new_elements = elements + igraph_verts_to_cyto(state.graph, new_nodes, [])
     if add_edges_opt:
         subgraph = state.graph.induced_subgraph(new_nodes)
         new_edges = get_filtered_edges(elements, subgraph.es)
-        new_elements.extend(igraph_edge_to_cyto(subgraph, edge, []) for edge in new_edges)
+        new_elements.extend(igraph_edges_to_cyto(subgraph, new_edges, []))
 
     return new_elements
 
@@ -475,9 +475,9 @@ def handle_tap_node(state: GraphState, elements, nodeData, expansion_mode):
             break
         
     neigh_nodes = graph.neighbors(nodeData['id'], expansion_mode)
-    neigh_names = set(graph.vs[ix]["name"] for ix in neigh_nodes)
-    neigh_edges = get_filtered_edges(elements, (graph.es[ix]
-                                        for ix in graph.incident(nodeData['id'], expansion_mode)))
+    neigh_verts = graph.vs.select(neigh_nodes)
+    neigh_names = set(neigh_verts["name"])
+    neigh_edges = get_filtered_edges(elements, graph.es.select(graph.incident(nodeData['id'], expansion_mode)))
     node_class, edge_class = "", ""
     if expansion_mode == "in":
         node_class, edge_class = "followerNode", "followerEdge"
@@ -485,9 +485,8 @@ def handle_tap_node(state: GraphState, elements, nodeData, expansion_mode):
         node_class, edge_class = "followingNode", "followingEdge"
 
     if do_expand:
-        elements.extend(igraph_vert_to_cyto(graph, graph.vs[node_ix], classes=[node_class, "selneighbor"]) for node_ix in neigh_nodes)
-        elements.extend(igraph_edge_to_cyto(graph, edge, classes=[edge_class, "selneighedge"])
-                        for edge in neigh_edges)
+        elements.extend(igraph_verts_to_cyto(graph, neigh_verts, classes=[node_class, "selneighbor"]))
+        elements.extend(igraph_edges_to_cyto(graph, neigh_edges, classes=[edge_class, "selneighedge"]))
 
     for element in elements:
         el_id = element.get('data').get('id')